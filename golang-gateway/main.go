@@ -77,6 +77,7 @@ type RoomTelemetry struct {
 type Gateway struct {
 	sensors           map[string]*SensorConfig
 	rooms             map[string]*RoomConfig
+	roomTopics        map[string]string
 	sensorToRoom      map[string]string
 	lastReadings      map[string]*SensorReading
 	readingsMutex     sync.RWMutex
@@ -95,6 +96,7 @@ func NewGateway(sensorsConfigPath, roomsConfigPath, mqttBroker, bacnetInterface,
 	gw := &Gateway{
 		sensors:       make(map[string]*SensorConfig),
 		rooms:         make(map[string]*RoomConfig),
+		roomTopics:    make(map[string]string),
 		sensorToRoom:  make(map[string]string),
 		lastReadings:  make(map[string]*SensorReading),
 		bacnetDevices: make(map[string]types.Device),
@@ -143,6 +145,7 @@ func (gw *Gateway) loadConfig(sensorsPath, roomsPath string) error {
 	for i := range roomsFile.Rooms {
 		room := &roomsFile.Rooms[i]
 		gw.rooms[room.ID] = room
+		gw.roomTopics[room.ID] = fmt.Sprintf("telemetry/%s", room.ID)
 		for _, sensorID := range room.Sensors {
 			gw.sensorToRoom[sensorID] = room.ID
 		}
@@ -485,7 +488,7 @@ func (gw *Gateway) aggregateRoomData(roomID string) *RoomTelemetry {
 }
 
 func (gw *Gateway) publishTelemetry(roomID string, telemetry *RoomTelemetry) {
-	topic := fmt.Sprintf("telemetry/%s", roomID)
+	topic := gw.roomTopics[roomID]
 
 	payload, err := json.Marshal(telemetry)
 	if err != nil {
@@ -2,7 +2,11 @@
 Real BACnet and Modbus server implementation with bacpypes3 and pymodbus.
 """
 import asyncio
+import json
 import logging
+import os
+import tempfile
+import time
 from argparse import Namespace
 from pathlib import Path
 from typing import Dict
@@ -28,6 +32,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Writable location for parsed-config caches (the config mount is read-only)
+CONFIG_CACHE_DIR = os.environ.get(
+    'CONFIG_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'smart-building-config')
+)
+# Bump when the cache entry format changes; older entries are then ignored
+_CONFIG_CACHE_VERSION = 2
+
+# Prefer the libyaml-backed loader; fall back to pure Python if it isn't built in
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+UPDATE_INTERVAL = 0.1  # Update 10 times per second
+
+# Sensor type (as used in sensors.yaml) -> Sensor class
+_SENSOR_TYPES = {
+    'temperature': TemperatureSensor,
+    'humidity': HumiditySensor,
+    'co2': CO2Sensor,
+    'air_quality': AirQualitySensor,
+    'light': LightSensor,
+    'energy': EnergySensor,
+    'motion': MotionSensor,
+    'occupancy': OccupancySensor,
+}
+
+
+async def _sleep_until_next_tick(loop: asyncio.AbstractEventLoop, next_tick: float) -> float:
+    """
+    Sleep until the next fixed-rate tick and return its deadline.
+
+    Deadlines advance by UPDATE_INTERVAL on the loop's monotonic clock, so time
+    spent updating sensors doesn't add up as drift. If an update overran a
+    whole interval, the schedule restarts from now instead of bursting.
+    """
+    next_tick += UPDATE_INTERVAL
+    delay = next_tick - loop.time()
+    if delay < 0:
+        next_tick -= delay
+        delay = 0
+    await asyncio.sleep(delay)
+    return next_tick
+
+
+def _load_cached_yaml(path: str):
+    """
+    Load a YAML file through a JSON cache in CONFIG_CACHE_DIR.
+
+    The config directory is mounted read-only, so caches live in a separate
+    writable directory (default: <tmpdir>/smart-building-config). A cache
+    entry records the source file's path, mtime and size and is only used
+    while all three still match; otherwise the YAML is parsed and the cache
+    rewritten. Data that JSON can't represent losslessly (dates, non-string
+    mapping keys, ...) is never cached, so the result doesn't depend on
+    whether a cache exists. Cache write failures are not fatal.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    cache_path = os.path.join(CONFIG_CACHE_DIR, os.path.basename(path) + '.cache.json')
+
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if (cached['version'] == _CONFIG_CACHE_VERSION and cached['path'] == path
+                and cached['mtime'] == st.st_mtime_ns and cached['size'] == st.st_size):
+            return cached['data']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    with open(path, 'rb') as f:
+        data = yaml.load(f.read(), Loader=_YAML_LOADER)
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        if json.loads(json.dumps(data)) != data:
+            logger.debug(f"Not caching {path}: contents don't round-trip through JSON")
+            return data
+        os.makedirs(CONFIG_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': _CONFIG_CACHE_VERSION,
+                'path': path,
+                'mtime': st.st_mtime_ns,
+                'size': st.st_size,
+                'data': data,
+            }, f)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"Could not write config cache {cache_path}: {e}")
+    finally:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+    return data
+
 
 class BACnetSimulator:
     """BACnet/IP server with real protocol implementation."""
@@ -39,6 +138,9 @@ class BACnetSimulator:
         """
         self.sensors_map = sensors_map
         self.bacnet_objects = {}
+        # Parallel lists for the update loop, one entry per object
+        self.avos = []
+        self.sensors = []
         self.app = None
         
     async def setup(self):
@@ -73,21 +175,18 @@ class BACnetSimulator:
             # Add to application
             self.app.add_object(avo)
             self.bacnet_objects[object_id] = (avo, sensor)
+            self.avos.append(avo)
+            self.sensors.append(sensor)
             
         logger.info(f"BACnet server initialized with {len(self.bacnet_objects)} objects on port 47808")
         
-    async def update_loop(self):
-        """Continuously update sensor values."""
-        while True:
-            try:
-                for object_id, (avo, sensor) in self.bacnet_objects.items():
-                    new_value = sensor.get_value()
-                    avo.presentValue = Real(new_value)
-                    
-                await asyncio.sleep(0.1)  # Update 10 times per second
-            except Exception as e:
-                logger.error(f"BACnet update error: {e}")
-                await asyncio.sleep(1)
+    def update(self, now: float):
+        """Push the current sensor values to their BACnet objects."""
+        for avo, sensor in zip(self.avos, self.sensors):
+            # Inlined Sensor.get_value(now)
+            new_value = sensor.last_value = sensor.read()
+            sensor.last_update = now
+            avo.presentValue = Real(new_value)
 
 
 class ModbusSimulator:
@@ -102,6 +201,7 @@ class ModbusSimulator:
         self.sensors_map = sensors_map
         self.port = port
         self.datastore = None
+        self.register_runs = []  # [(start_register, [Sensor, ...]), ...]
         
     async def setup(self):
         """Initialize Modbus datastore."""
@@ -115,33 +215,36 @@ class ModbusSimulator:
             ir=ModbusSequentialDataBlock(0, [0] * 1000)
         )
         self.datastore = ModbusServerContext(slaves=store, single=True)
+
+        # Group contiguous registers so each run is written with one setValues call
+        self.register_runs = []
+        for register in sorted(self.sensors_map):
+            sensor = self.sensors_map[register]
+            if self.register_runs:
+                start, sensors = self.register_runs[-1]
+                if start + len(sensors) == register:
+                    sensors.append(sensor)
+                    continue
+            self.register_runs.append((register, [sensor]))
         
         logger.info(f"Modbus TCP server initialized with {len(self.sensors_map)} registers on port {self.port}")
         
-    async def update_loop(self):
-        """Continuously update register values from sensors."""
-        while True:
-            try:
-                for register, sensor in self.sensors_map.items():
-                    value = sensor.get_value()
-                    # Convert float to int (scaled by 100 for precision)
-                    scaled_value = int(value * 100)
-                    # Write to holding register (function code 3)
-                    self.datastore[0].setValues(3, register, [scaled_value])
-                    
-                await asyncio.sleep(0.1)  # Update 10 times per second
-            except Exception as e:
-                logger.error(f"Modbus update error: {e}")
-                await asyncio.sleep(1)
+    def update(self, now: float):
+        """Write the current sensor values to their holding registers."""
+        store = self.datastore[0]
+        for start, sensors in self.register_runs:
+            scaled_values = []
+            for sensor in sensors:
+                # Inlined Sensor.get_value(now)
+                value = sensor.last_value = sensor.read()
+                sensor.last_update = now
+                # Convert float to int (scaled by 100 for precision)
+                scaled_values.append(int(value * 100))
+            # Write the whole run to holding registers (function code 3)
+            store.setValues(3, start, scaled_values)
                 
     async def run_server(self):
-        """Start Modbus TCP server."""
-        await self.setup()
-        
-        # Start update loop in background
-        asyncio.create_task(self.update_loop())
-        
-        # Start Modbus server
+        """Start Modbus TCP server. Call setup() first."""
         await StartAsyncTcpServer(
             context=self.datastore,
             address=("0.0.0.0", self.port)
@@ -167,9 +270,8 @@ class SimulatorCoordinator:
         logger.info("Loading configuration...")
         
         # Load rooms
-        with open(rooms_path, 'r') as f:
-            rooms_data = yaml.safe_load(f)
-            self.rooms = {room['id']: room for room in rooms_data['rooms']}
+        rooms_data = _load_cached_yaml(rooms_path)
+        self.rooms = {room['id']: room for room in rooms_data['rooms']}
             
         # Map sensors to rooms
         sensor_to_room = {}
@@ -178,8 +280,7 @@ class SimulatorCoordinator:
                 sensor_to_room[sensor_id] = room['id']
                 
         # Load sensors
-        with open(sensors_path, 'r') as f:
-            sensors_data = yaml.safe_load(f)
+        sensors_data = _load_cached_yaml(sensors_path)
             
         for sensor_config in sensors_data['sensors']:
             sensor_id = sensor_config['id']
@@ -204,40 +305,59 @@ class SimulatorCoordinator:
         
     def _create_sensor(self, sensor_type: str, sensor_id: str, room_id: str):
         """Factory method to create sensor instances."""
-        if sensor_type == 'temperature':
-            return TemperatureSensor(sensor_id, room_id)
-        elif sensor_type == 'humidity':
-            return HumiditySensor(sensor_id, room_id)
-        elif sensor_type == 'co2':
-            return CO2Sensor(sensor_id, room_id)
-        elif sensor_type == 'air_quality':
-            return AirQualitySensor(sensor_id, room_id)
-        elif sensor_type == 'light':
-            return LightSensor(sensor_id, room_id)
-        elif sensor_type == 'energy':
-            return EnergySensor(sensor_id, room_id)
-        elif sensor_type == 'motion':
-            return MotionSensor(sensor_id, room_id)
-        elif sensor_type == 'occupancy':
-            return OccupancySensor(sensor_id, room_id)
-        else:
+        sensor_cls = _SENSOR_TYPES.get(sensor_type)
+        if sensor_cls is None:
             raise ValueError(f"Unknown sensor type: {sensor_type}")
+        return sensor_cls(sensor_id, room_id)
+            
+    async def unified_update_loop(self):
+        """
+        Update BACnet objects and Modbus registers from a single fixed-rate loop.
+
+        Each protocol is updated in its own try block: a failing update is
+        logged and that protocol alone backs off for a second, while the other
+        keeps its 10 Hz cadence.
+        """
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        bacnet_resume_at = modbus_resume_at = next_tick
+        while True:
+            # One timestamp for every sensor read in this tick
+            now = time.time()
+            tick_time = loop.time()
+
+            if tick_time >= bacnet_resume_at:
+                try:
+                    self.bacnet_sim.update(now)
+                except Exception as e:
+                    logger.error(f"BACnet update error: {e}")
+                    bacnet_resume_at = tick_time + 1
+
+            if tick_time >= modbus_resume_at:
+                try:
+                    self.modbus_sim.update(now)
+                except Exception as e:
+                    logger.error(f"Modbus update error: {e}")
+                    modbus_resume_at = tick_time + 1
+                    
+            next_tick = await _sleep_until_next_tick(loop, next_tick)
             
     async def run(self):
         """Start all servers."""
         logger.info("Starting simulator...")
         
-        # Setup BACnet
+        # Setup BACnet and Modbus
         await self.bacnet_sim.setup()
+        await self.modbus_sim.setup()
         
         # Start tasks
-        bacnet_task = asyncio.create_task(self.bacnet_sim.update_loop())
+        update_task = asyncio.create_task(self.unified_update_loop())
         modbus_task = asyncio.create_task(self.modbus_sim.run_server())
         
         logger.info("Simulator running...")
         
         # Wait for tasks
-        await asyncio.gather(bacnet_task, modbus_task)
+        await asyncio.gather(update_task, modbus_task)
 
 
 async def main():
@@ -1,60 +1,95 @@
 """
 Sensor base classes and protocol implementations for building automation simulation.
 """
-import random
-import time
 import struct
-from abc import ABC, abstractmethod
-from typing import Dict, Any
+from functools import lru_cache
+from random import randint as _randint, random as _rand, uniform as _uniform
+from time import time as _time
+from typing import Dict, Any, Iterable, Optional
 
+_NAN = float('nan')
 
-class Sensor(ABC):
+# Precompiled response formats: object_id/register + float value
+_PACK_IF = struct.Struct('!If').pack
+_PACK_HF = struct.Struct('!Hf').pack
+
+
+@lru_cache(maxsize=64)
+def _batch_struct(record_format: str, count: int) -> struct.Struct:
+    """Struct for a whole batch frame: payload length + count records."""
+    return struct.Struct('!I' + record_format * count)
+
+
+@lru_cache(maxsize=256)
+def _bacnet_error_response(object_id: int) -> bytes:
+    """Error response for an unknown object: object_id + NaN."""
+    return _PACK_IF(object_id, _NAN)
+
+
+@lru_cache(maxsize=256)
+def _modbus_error_response(register: int) -> bytes:
+    """Error response for an unknown register: register + NaN."""
+    return _PACK_HF(register, _NAN)
+
+
+class Sensor:
     """Base class for all sensor types."""
+
+    __slots__ = ('sensor_id', 'room_id', 'last_value', 'last_update')
     
     def __init__(self, sensor_id: str, room_id: str):
         self.sensor_id = sensor_id
         self.room_id = room_id
         self.last_value = None
-        self.last_update = time.time()
+        self.last_update = _time()
         
-    @abstractmethod
     def read(self) -> float:
-        """Read current sensor value."""
-        pass
+        """Read current sensor value. Implemented by each sensor type."""
+        raise NotImplementedError
     
-    def get_value(self) -> float:
-        """Get current value with timestamp update."""
+    def get_value(self, now: Optional[float] = None) -> float:
+        """
+        Get current value with timestamp update.
+
+        Args:
+            now: Timestamp to record; callers reading many sensors in one sweep
+                pass a single shared time.time() value. Defaults to the current time.
+        """
         self.last_value = self.read()
-        self.last_update = time.time()
+        self.last_update = _time() if now is None else now
         return self.last_value
 
 
 class TemperatureSensor(Sensor):
     """Temperature sensor (BACnet) - simulates realistic HVAC behavior."""
+
+    __slots__ = ('base_temp', 'current_temp', 'drift_rate')
     
     def __init__(self, sensor_id: str, room_id: str, base_temp: float = 21.0):
         super().__init__(sensor_id, room_id)
         self.base_temp = base_temp
         self.current_temp = base_temp
-        self.drift_rate = random.uniform(-0.01, 0.01)
+        self.drift_rate = _uniform(-0.01, 0.01)
         
     def read(self) -> float:
         """Simulate gradual temperature changes."""
         # Slow drift + small random fluctuation
-        self.current_temp += self.drift_rate + random.uniform(-0.1, 0.1)
+        t = self.current_temp + self.drift_rate + _uniform(-0.1, 0.1)
         
         # Keep within realistic bounds
-        self.current_temp = max(18, min(28, self.current_temp))
+        self.current_temp = 18.0 if t < 18.0 else 28.0 if t > 28.0 else t
         
         # Occasionally reset drift direction
-        if random.random() < 0.01:
-            self.drift_rate = random.uniform(-0.01, 0.01)
+        if _rand() < 0.01:
+            self.drift_rate = _uniform(-0.01, 0.01)
             
-        return round(self.current_temp, 2)
+        return self.current_temp
 
 
 class HumiditySensor(Sensor):
     """Humidity sensor (BACnet) - correlates with temperature."""
+
+    __slots__ = ('base_humidity', 'current_humidity')
     
     def __init__(self, sensor_id: str, room_id: str, base_humidity: float = 45.0):
         super().__init__(sensor_id, room_id)
@@ -63,84 +98,96 @@ class HumiditySensor(Sensor):
         
     def read(self) -> float:
         """Simulate humidity fluctuations."""
-        self.current_humidity += random.uniform(-0.5, 0.5)
-        self.current_humidity = max(30, min(70, self.current_humidity))
-        return round(self.current_humidity, 2)
+        h = self.current_humidity + _uniform(-0.5, 0.5)
+        self.current_humidity = 30.0 if h < 30.0 else 70.0 if h > 70.0 else h
+        return self.current_humidity
 
 
 class CO2Sensor(Sensor):
     """CO2 sensor (BACnet) - varies with occupancy."""
+
+    __slots__ = ('base_co2', 'current_co2', 'occupancy_multiplier', 'target')
     
     def __init__(self, sensor_id: str, room_id: str, base_co2: float = 450.0):
         super().__init__(sensor_id, room_id)
         self.base_co2 = base_co2
         self.current_co2 = base_co2
         self.occupancy_multiplier = 1.0
+        self.target = base_co2
         
     def set_occupancy(self, count: int):
         """Adjust CO2 based on occupancy."""
         self.occupancy_multiplier = 1.0 + (count * 0.1)
+        self.target = self.base_co2 * self.occupancy_multiplier
         
     def read(self) -> float:
         """Simulate CO2 levels."""
-        target = self.base_co2 * self.occupancy_multiplier
-        self.current_co2 += (target - self.current_co2) * 0.1 + random.uniform(-10, 10)
-        self.current_co2 = max(400, min(2000, self.current_co2))
-        return round(self.current_co2, 2)
+        c = self.current_co2
+        c += (self.target - c) * 0.1 + _uniform(-10, 10)
+        self.current_co2 = 400.0 if c < 400.0 else 2000.0 if c > 2000.0 else c
+        return self.current_co2
 
 
 class AirQualitySensor(Sensor):
     """Air quality index sensor (BACnet)."""
+
+    __slots__ = ('current_aqi',)
     
     def __init__(self, sensor_id: str, room_id: str):
         super().__init__(sensor_id, room_id)
-        self.current_aqi = random.uniform(50, 100)
+        self.current_aqi = _uniform(50, 100)
         
     def read(self) -> float:
         """Simulate air quality index."""
-        self.current_aqi += random.uniform(-2, 2)
-        self.current_aqi = max(0, min(100, self.current_aqi))
-        return round(self.current_aqi, 2)
+        a = self.current_aqi + _uniform(-2, 2)
+        self.current_aqi = 0.0 if a < 0.0 else 100.0 if a > 100.0 else a
+        return self.current_aqi
 
 
 class LightSensor(Sensor):
     """Light level sensor (Modbus) - binary on/off states."""
+
+    __slots__ = ('is_on', 'lux_level')
     
     def __init__(self, sensor_id: str, room_id: str):
         super().__init__(sensor_id, room_id)
-        self.is_on = random.choice([True, False])
+        self.is_on = _rand() < 0.5
         self.lux_level = 500 if self.is_on else 0
         
     def read(self) -> float:
         """Simulate light levels."""
         # Occasional on/off transitions
-        if random.random() < 0.02:
+        if _rand() < 0.02:
             self.is_on = not self.is_on
             
         if self.is_on:
-            self.lux_level = random.uniform(300, 600)
+            self.lux_level = _uniform(300, 600)
         else:
-            self.lux_level = random.uniform(0, 50)
+            self.lux_level = _uniform(0, 50)
             
-        return round(self.lux_level, 2)
+        return self.lux_level
 
 
 class EnergySensor(Sensor):
     """Energy meter (Modbus) - cumulative consumption."""
+
+    __slots__ = ('cumulative_kwh', 'consumption_rate')
     
     def __init__(self, sensor_id: str, room_id: str):
         super().__init__(sensor_id, room_id)
-        self.cumulative_kwh = random.uniform(0, 5)
-        self.consumption_rate = random.uniform(0.001, 0.005)
+        self.cumulative_kwh = _uniform(0, 5)
+        self.consumption_rate = _uniform(0.001, 0.005)
         
     def read(self) -> float:
         """Simulate energy consumption."""
         self.cumulative_kwh += self.consumption_rate
-        return round(self.cumulative_kwh, 5)
+        return self.cumulative_kwh
 
 
 class MotionSensor(Sensor):
     """Motion detector (Modbus) - binary."""
+
+    __slots__ = ('motion_detected',)
     
     def __init__(self, sensor_id: str, room_id: str):
         super().__init__(sensor_id, room_id)
@@ -149,29 +196,38 @@ class MotionSensor(Sensor):
     def read(self) -> float:
         """Simulate motion detection."""
         # Random motion events
-        if random.random() < 0.1:
+        if _rand() < 0.1:
             self.motion_detected = not self.motion_detected
         return 1.0 if self.motion_detected else 0.0
 
 
 class OccupancySensor(Sensor):
     """Occupancy counter (Modbus)."""
+
+    __slots__ = ('max_occupancy', 'current_count')
     
     def __init__(self, sensor_id: str, room_id: str, max_occupancy: int = 15):
         super().__init__(sensor_id, room_id)
         self.max_occupancy = max_occupancy
-        self.current_count = random.randint(0, max_occupancy)
+        self.current_count = _randint(0, max_occupancy)
         
     def read(self) -> float:
         """Simulate occupancy count."""
         # Gradual changes in occupancy
-        change = random.choice([-1, 0, 0, 0, 1])
+        # -1 / 0 / +1 with probabilities 0.2 / 0.6 / 0.2
+        r = _rand()
+        change = -1 if r < 0.2 else (1 if r >= 0.8 else 0)
         self.current_count = max(0, min(self.max_occupancy, self.current_count + change))
         return float(self.current_count)
 
 
 class BACnetServer:
     """Lightweight BACnet simulation - simple UDP request/response."""
+
+    # Repeat reads of an object within one tick, single or batched, reuse
+    # the value (and packed response) from the first read
+    CACHE_TICK = 0.1  # seconds
+    CACHE_SLOTS = 512  # direct-mapped by object_id, must be a power of two
     
     def __init__(self, sensors: Dict[int, Sensor]):
         """
@@ -179,19 +235,54 @@ class BACnetServer:
             sensors: Dictionary mapping object_id to Sensor instance
         """
         self.sensors = sensors
+        # slot -> (object_id, tick, value, response or None)
+        self.response_cache = [None] * self.CACHE_SLOTS
+
+    def _cached_read(self, object_id: int, sensor: Sensor, now: float) -> tuple:
+        """Return the cache entry for object_id, reading the sensor once per tick."""
+        tick = int(now / self.CACHE_TICK)
+        slot = object_id & (self.CACHE_SLOTS - 1)
+        entry = self.response_cache[slot]
+        if entry is None or entry[0] != object_id or entry[1] != tick:
+            entry = (object_id, tick, sensor.get_value(now), None)
+            self.response_cache[slot] = entry
+        return entry
         
     def handle_read_request(self, object_id: int) -> bytes:
         """
         Handle read property request for an object.
         Returns: 8-byte response with float value
         """
-        if object_id in self.sensors:
-            value = self.sensors[object_id].get_value()
-            # Simple protocol: 4 bytes object_id + 4 bytes float value
-            return struct.pack('!If', object_id, value)
+        sensor = self.sensors.get(object_id)
+        if sensor is not None:
+            entry = self._cached_read(object_id, sensor, _time())
+            response = entry[3]
+            if response is None:
+                # Simple protocol: 4 bytes object_id + 4 bytes float value
+                response = _PACK_IF(object_id, entry[2])
+                self.response_cache[object_id & (self.CACHE_SLOTS - 1)] = entry[:3] + (response,)
+            return response
         else:
             # Return error: object_id + NaN
-            return struct.pack('!If', object_id, float('nan'))
+            return _bacnet_error_response(object_id)
+
+    def handle_batch_request(self, object_ids: Iterable[int]) -> bytes:
+        """
+        Handle read property requests for several objects in one frame.
+        Returns: 4-byte payload length, then one 8-byte object_id + float
+        record per requested object (NaN for unknown objects)
+        """
+        object_ids = list(object_ids)
+        frame = _batch_struct('If', len(object_ids))
+        fields = [frame.size - 4]
+        # One timestamp for every sensor read in this batch
+        now = _time()
+        for object_id in object_ids:
+            sensor = self.sensors.get(object_id)
+            fields.append(object_id)
+            fields.append(_NAN if sensor is None else self._cached_read(object_id, sensor, now)[2])
+        # One pack call for the whole frame, straight into the result bytes
+        return frame.pack(*fields)
 
 
 class ModbusServer:
@@ -212,7 +303,25 @@ class ModbusServer:
         if register in self.sensors:
             value = self.sensors[register].get_value()
             # Simple protocol: 2 bytes register + 4 bytes float value
-            return struct.pack('!Hf', register, value)
+            return _PACK_HF(register, value)
         else:
             # Return error
-            return struct.pack('!Hf', register, float('nan'))
+            return _modbus_error_response(register)
+
+    def handle_batch_request(self, registers: Iterable[int]) -> bytes:
+        """
+        Handle read holding register requests for several registers in one frame.
+        Returns: 4-byte payload length, then one 6-byte register + float
+        record per requested register (NaN for unknown registers)
+        """
+        registers = list(registers)
+        frame = _batch_struct('Hf', len(registers))
+        fields = [frame.size - 4]
+        # One timestamp for every sensor read in this batch
+        now = _time()
+        for register in registers:
+            sensor = self.sensors.get(register)
+            fields.append(register)
+            fields.append(_NAN if sensor is None else sensor.get_value(now))
+        # One pack call for the whole frame, straight into the result bytes
+        return frame.pack(*fields)